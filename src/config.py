@@ -1,3 +1,4 @@
+import os
 from typing import List
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
@@ -7,7 +8,8 @@ class Settings(BaseSettings):
 
     model_config = SettingsConfigDict(
         env_file='.env',
-        env_file_encoding='utf-8'
+        env_file_encoding='utf-8',
+        frozen=True
     )
 
     ANTHROPIC_API_KEY: str = Field(
@@ -53,8 +55,14 @@ class Settings(BaseSettings):
     INTENT_CONFIDENCE_THRESHOLD: float = 0.3
     SPAM_CONFIDENCE_THRESHOLD: float = 0.7
 
+    MAX_BATCH_SIZE: int = 20
+
     API_HOST: str = "127.0.0.1"
     API_PORT: int = 8000
+    API_WORKERS: int = Field(
+        default_factory=lambda: os.cpu_count() or 1,
+        description="Number of uvicorn worker processes"
+    )
 
     USE_LOCAL_LLM: bool = False
     LOCAL_LLM_URL: str = ""
@@ -63,3 +71,8 @@ class Settings(BaseSettings):
 
 
 settings = Settings()
+
+INTENT_THRESHOLD = settings.INTENT_CONFIDENCE_THRESHOLD
+SPAM_THRESHOLD = settings.SPAM_CONFIDENCE_THRESHOLD
+ENABLE_NUANCE = settings.ENABLE_NUANCE_ANALYSIS
+ENABLE_VERACITY = settings.ENABLE_VERACITY_CHECK
@@ -1,7 +1,11 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
+from typing import Annotated, List
 
-from fastapi import FastAPI
+from cachetools import TTLCache
+from fastapi import Body, FastAPI
+from fastapi.responses import ORJSONResponse
 
 from .config import settings
 from .models.api_models import (
@@ -9,7 +13,7 @@ from .models.api_models import (
     AdvancedEvaluationResponse,
     HealthResponse
 )
-from .services.evaluation_service import AdvancedEvaluationService
+from .services.evaluation_service import AdvancedEvaluationService, utc_timestamp
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -19,18 +23,30 @@ VERSION = "2.0.0"
 
 app_state = {}
 
+deep_health_cache: TTLCache = TTLCache(maxsize=1, ttl=60)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    app_state["evaluation_service"] = AdvancedEvaluationService()
+    app_state["evaluation_service"] = None
+    app_state["init_lock"] = asyncio.Lock()
     logger.info("Social Media Context Analyzer started")
     yield
+    service = app_state.get("evaluation_service")
+    if service is not None:
+        await service.claude_service.close()
     app_state.clear()
     logger.info("Social Media Context Analyzer stopped")
 
 
-def get_evaluation_service() -> AdvancedEvaluationService:
-    return app_state["evaluation_service"]
+async def get_evaluation_service() -> AdvancedEvaluationService:
+    service = app_state.get("evaluation_service")
+    if service is None:
+        async with app_state.setdefault("init_lock", asyncio.Lock()):
+            service = app_state.get("evaluation_service")
+            if service is None:
+                service = app_state["evaluation_service"] = AdvancedEvaluationService()
+    return service
 
 
 def create_app() -> FastAPI:
@@ -38,7 +54,8 @@ def create_app() -> FastAPI:
         title="Social Media Context Analyzer",
         description="Multi-stage analysis service for evaluating social media content using LLM-powered analysis",
         version=VERSION,
-        lifespan=lifespan
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse
     )
 
 
@@ -47,33 +64,95 @@ app = create_app()
 
 @app.get("/", response_model=HealthResponse, tags=["Health"])
 async def root() -> HealthResponse:
-    service = get_evaluation_service()
-    test_result = await service.perform_full_analysis("health", "test", "en")
-
     return HealthResponse(
         status="operational",
-        timestamp=test_result["analysis_timestamp"],
+        timestamp=utc_timestamp(),
         version=VERSION
     )
 
 
-@app.post("/evaluate", response_model=AdvancedEvaluationResponse, tags=["Analysis"])
-async def evaluate_content(request: SocialMediaPostRequest) -> AdvancedEvaluationResponse:
-    service = get_evaluation_service()
+@app.get("/healthz/deep", response_model=HealthResponse, tags=["Health"])
+async def deep_health() -> HealthResponse:
+    cached = deep_health_cache.get("deep")
+    if cached is not None:
+        return cached
+
+    service = await get_evaluation_service()
+    try:
+        await service.claude_service.ping()
+        status = "operational"
+    except Exception as e:
+        logger.error(f"Deep health check failed: {e}")
+        status = "degraded"
+
+    health = HealthResponse(
+        status=status,
+        timestamp=utc_timestamp(),
+        version=VERSION
+    )
+    deep_health_cache["deep"] = health
+    return health
+
+
+@app.post(
+    "/evaluate",
+    response_model=None,
+    responses={200: {"model": AdvancedEvaluationResponse}},
+    tags=["Analysis"]
+)
+async def evaluate_content(request: SocialMediaPostRequest) -> ORJSONResponse:
+    service = await get_evaluation_service()
     result = await service.perform_full_analysis(
         post_id=request.post_id,
         post_text=request.post_text,
         language=request.language
     )
 
-    return AdvancedEvaluationResponse(**result)
+    return ORJSONResponse(result)
+
+
+@app.post(
+    "/evaluate_batch",
+    response_model=None,
+    responses={200: {"model": List[AdvancedEvaluationResponse]}},
+    tags=["Analysis"]
+)
+async def evaluate_batch(
+    requests: Annotated[
+        List[SocialMediaPostRequest],
+        Body(min_length=1, max_length=settings.MAX_BATCH_SIZE)
+    ]
+) -> ORJSONResponse:
+    service = await get_evaluation_service()
+    results = await service.perform_batch_analysis([
+        (request.post_id, request.post_text, request.language)
+        for request in requests
+    ])
+
+    return ORJSONResponse(results)
 
 
 @app.get("/config", tags=["Configuration"])
 def get_config() -> dict:
+    service = app_state.get("evaluation_service")
     return {
         "enable_advanced_analysis": settings.ENABLE_ADVANCED_ANALYSIS,
         "enable_veracity_check": settings.ENABLE_VERACITY_CHECK,
         "enable_nuance_analysis": settings.ENABLE_NUANCE_ANALYSIS,
-        "claude_model": settings.CLAUDE_MODEL
+        "claude_model": settings.CLAUDE_MODEL,
+        # Result cache counters; None until the first request has created the service
+        "claude_cache": service.claude_service.cache_stats() if service is not None else None
     }
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(
+        "src.main:app",
+        host=settings.API_HOST,
+        port=settings.API_PORT,
+        workers=settings.API_WORKERS,
+        loop="uvloop",
+        http="httptools"
+    )
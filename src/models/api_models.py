@@ -150,9 +150,9 @@ class AdvancedEvaluationResponse(BaseModel):
         None,
         description="Veracity analysis (only for claims)"
     )
-    nuance_analysis: NuanceAnalysis = Field(
-        ...,
-        description="Nuance analysis results"
+    nuance_analysis: Optional[NuanceAnalysis] = Field(
+        None,
+        description="Nuance analysis results (omitted for spam or when disabled)"
     )
     processing_error: Optional[str] = Field(
         None,
@@ -1,30 +1,376 @@
-import json
+import asyncio
 import logging
-import time
-from typing import Dict, List, Tuple
-from anthropic import Anthropic
+import re
+from hashlib import blake2b
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+import httpx
+import orjson
+from anthropic import APIStatusError, AsyncAnthropic
+from cachetools import TTLCache
 from ..config import settings
 
 logger = logging.getLogger(__name__)
 
+LABELS_BY_LANG: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "en": {
+        "post_type": tuple(settings.EN_POST_TYPES),
+        "political": tuple(settings.EN_POLITICAL_LABELS),
+        "intent": tuple(settings.EN_INTENT_LABELS)
+    },
+    "de": {
+        "post_type": tuple(settings.DE_POST_TYPES),
+        "political": tuple(settings.DE_POLITICAL_LABELS),
+        "intent": tuple(settings.DE_INTENT_LABELS)
+    }
+}
+
+_EN_SCORES_FORMAT = """{
+    "scores": {
+        "category1": 0.95,
+        "category2": 0.03,
+        "category3": 0.02
+    }
+}
+"""
+_DE_SCORES_FORMAT = """{
+    "scores": {
+        "kategorie1": 0.95,
+        "kategorie2": 0.03,
+        "kategorie3": 0.02
+    }
+}
+"""
+_EN_JSON_INSTRUCTION = "\nRespond only with a JSON object in the following format:\n"
+_DE_JSON_INSTRUCTION = "\nAntworte nur mit einem JSON-Objekt im folgenden Format:\n"
+
+
+def _labels(language: str, kind: str) -> str:
+    return ', '.join(LABELS_BY_LANG[language][kind])
+
+
+# (prefix, suffix) pairs per (kind, language); a prompt is prefix + '"<text>"\n' + suffix
+PROMPT_TEMPLATES: Dict[Tuple[str, str], Tuple[str, str]] = {
+    ("classify", "en"): (
+        f"\nClassify the following text into one of these categories: {_labels('en', 'post_type')}\n\nText: ",
+        _EN_JSON_INSTRUCTION + """{
+    "primary_label": "chosen_category",
+    "confidence": 0.95,
+    "scores": {
+        "category1": 0.95,
+        "category2": 0.03,
+        "category3": 0.02
+    }
+}
+"""
+    ),
+    ("classify", "de"): (
+        f"\nKlassifiziere den folgenden Text in eine der Kategorien: {_labels('de', 'post_type')}\n\nText: ",
+        _DE_JSON_INSTRUCTION + """{
+    "primary_label": "gewählte_kategorie",
+    "confidence": 0.95,
+    "scores": {
+        "kategorie1": 0.95,
+        "kategorie2": 0.03,
+        "kategorie3": 0.02
+    }
+}
+"""
+    ),
+    ("political", "en"): (
+        f"\nAnalyze the political tendency of the following text: {_labels('en', 'political')}\n\nText: ",
+        _EN_JSON_INSTRUCTION + _EN_SCORES_FORMAT
+    ),
+    ("political", "de"): (
+        f"\nAnalysiere die politische Tendenz des folgenden Textes: {_labels('de', 'political')}\n\nText: ",
+        _DE_JSON_INSTRUCTION + _DE_SCORES_FORMAT
+    ),
+    ("intent", "en"): (
+        f"\nAnalyze the intents in the following text: {_labels('en', 'intent')}\n\nText: ",
+        _EN_JSON_INSTRUCTION + _EN_SCORES_FORMAT
+    ),
+    ("intent", "de"): (
+        f"\nAnalysiere die Absichten im folgenden Text: {_labels('de', 'intent')}\n\nText: ",
+        _DE_JSON_INSTRUCTION + _DE_SCORES_FORMAT
+    ),
+    ("combined", "en"): (
+        "\nAnalyze the following text in three steps:\n"
+        f"1. Classify it into one of these categories: {_labels('en', 'post_type')}\n"
+        f"2. Analyze its political tendency: {_labels('en', 'political')}\n"
+        f"3. Analyze its intents: {_labels('en', 'intent')}\n\nText: ",
+        _EN_JSON_INSTRUCTION + """{
+    "post_type": {
+        "primary_label": "chosen_category",
+        "confidence": 0.95,
+        "scores": {
+            "category1": 0.95,
+            "category2": 0.03,
+            "category3": 0.02
+        }
+    },
+    "political": {
+        "scores": {
+            "category1": 0.95,
+            "category2": 0.03,
+            "category3": 0.02
+        }
+    },
+    "intents": {
+        "scores": {
+            "category1": 0.95,
+            "category2": 0.03,
+            "category3": 0.02
+        }
+    }
+}
+"""
+    ),
+    ("combined", "de"): (
+        "\nAnalysiere den folgenden Text in drei Schritten:\n"
+        f"1. Klassifiziere ihn in eine der Kategorien: {_labels('de', 'post_type')}\n"
+        f"2. Analysiere seine politische Tendenz: {_labels('de', 'political')}\n"
+        f"3. Analysiere seine Absichten: {_labels('de', 'intent')}\n\nText: ",
+        _DE_JSON_INSTRUCTION + """{
+    "post_type": {
+        "primary_label": "gewählte_kategorie",
+        "confidence": 0.95,
+        "scores": {
+            "kategorie1": 0.95,
+            "kategorie2": 0.03,
+            "kategorie3": 0.02
+        }
+    },
+    "political": {
+        "scores": {
+            "kategorie1": 0.95,
+            "kategorie2": 0.03,
+            "kategorie3": 0.02
+        }
+    },
+    "intents": {
+        "scores": {
+            "kategorie1": 0.95,
+            "kategorie2": 0.03,
+            "kategorie3": 0.02
+        }
+    }
+}
+"""
+    ),
+    ("combined_batch", "en"): (
+        "\nAnalyze each of the following numbered texts in three steps:\n"
+        f"1. Classify it into one of these categories: {_labels('en', 'post_type')}\n"
+        f"2. Analyze its political tendency: {_labels('en', 'political')}\n"
+        f"3. Analyze its intents: {_labels('en', 'intent')}\n\nTexts:\n",
+        _EN_JSON_INSTRUCTION + """{
+    "results": [
+        {
+            "id": 1,
+            "post_type": {
+                "primary_label": "chosen_category",
+                "confidence": 0.95,
+                "scores": {
+                    "category1": 0.95,
+                    "category2": 0.03,
+                    "category3": 0.02
+                }
+            },
+            "political": {
+                "scores": {
+                    "category1": 0.95,
+                    "category2": 0.03,
+                    "category3": 0.02
+                }
+            },
+            "intents": {
+                "scores": {
+                    "category1": 0.95,
+                    "category2": 0.03,
+                    "category3": 0.02
+                }
+            }
+        }
+    ]
+}
+Include exactly one entry per text, using its number as the id.
+"""
+    ),
+    ("combined_batch", "de"): (
+        "\nAnalysiere jeden der folgenden nummerierten Texte in drei Schritten:\n"
+        f"1. Klassifiziere ihn in eine der Kategorien: {_labels('de', 'post_type')}\n"
+        f"2. Analysiere seine politische Tendenz: {_labels('de', 'political')}\n"
+        f"3. Analysiere seine Absichten: {_labels('de', 'intent')}\n\nTexte:\n",
+        _DE_JSON_INSTRUCTION + """{
+    "results": [
+        {
+            "id": 1,
+            "post_type": {
+                "primary_label": "gewählte_kategorie",
+                "confidence": 0.95,
+                "scores": {
+                    "kategorie1": 0.95,
+                    "kategorie2": 0.03,
+                    "kategorie3": 0.02
+                }
+            },
+            "political": {
+                "scores": {
+                    "kategorie1": 0.95,
+                    "kategorie2": 0.03,
+                    "kategorie3": 0.02
+                }
+            },
+            "intents": {
+                "scores": {
+                    "kategorie1": 0.95,
+                    "kategorie2": 0.03,
+                    "kategorie3": 0.02
+                }
+            }
+        }
+    ]
+}
+Gib genau einen Eintrag pro Text zurück und verwende seine Nummer als id.
+"""
+    ),
+    ("veracity", "en"): (
+        "\nYou are a neutral, impartial fact-checker. Evaluate the following claim based on your knowledge.\n\nClaim: ",
+        _EN_JSON_INSTRUCTION + """{
+    "status": "Factually Correct|Untruth|Misleading|Unverifiable",
+    "justification": "Brief justification",
+    "verification_method": "AI-based analysis"
+}
+"""
+    ),
+    ("veracity", "de"): (
+        "\nDu bist ein neutraler, unparteiischer deutscher Faktenchecker. Bewerte die folgende Behauptung basierend auf deinem Wissen.\n\nBehauptung: ",
+        _DE_JSON_INSTRUCTION + """{
+    "status": "Factually Correct|Untruth|Misleading|Unverifiable",
+    "justification": "Kurze Begründung",
+    "verification_method": "AI-basierte Analyse"
+}
+"""
+    )
+}
+
+MAX_TOKENS: Dict[str, int] = {
+    "classify": 256,
+    "political": 256,
+    "intent": 256,
+    "combined": 512,
+    # Per text in a combined batch prompt
+    "combined_batch": 512,
+    "veracity": 400
+}
+
+# Output token cap of the configured Claude model; batch prompts are split so they stay under it
+MODEL_MAX_OUTPUT_TOKENS = 8192
+BATCH_CHUNK_SIZE = MODEL_MAX_OUTPUT_TOKENS // MAX_TOKENS["combined_batch"]
+
+# Client errors that are worth retrying, the same set the anthropic SDK retries
+RETRYABLE_CLIENT_ERRORS = frozenset({408, 409, 429})
+
+# Raised while parsing a reply that did arrive; only these justify re-asking with smaller prompts
+PARSE_ERRORS = (orjson.JSONDecodeError, KeyError, TypeError, AttributeError)
+
+SYSTEM_PROMPT = (
+    "Respond with a single raw JSON object only. "
+    "Do not add any preamble, explanation or code fences."
+)
+
+# Prefilled as the start of the assistant turn so the model continues the JSON object directly
+JSON_PREFILL = "{"
+
+# Classification streams are closed as soon as both fields have been decoded
+PRIMARY_LABEL_PATTERN = re.compile(r'"primary_label"\s*:\s*"([^"]+)"')
+CONFIDENCE_PATTERN = re.compile(r'"confidence"\s*:\s*([0-9]*\.?[0-9]+)\s*[,}]')
+
+
+ZERO_SCORES: Dict[Tuple[str, ...], Mapping[str, float]] = {
+    labels: MappingProxyType(dict.fromkeys(labels, 0.0))
+    for labels_by_kind in LABELS_BY_LANG.values()
+    for labels in labels_by_kind.values()
+}
+UNIFORM_SCORES: Dict[Tuple[str, ...], Mapping[str, float]] = {
+    labels: MappingProxyType({label: 1.0 / len(labels) for label in labels})
+    for labels_by_kind in LABELS_BY_LANG.values()
+    for labels in labels_by_kind.values()
+}
+
+DEFAULT_CLASSIFICATIONS: Dict[str, Tuple[str, float, Mapping[str, float]]] = {
+    language: (
+        labels["post_type"][0],
+        1.0 / len(labels["post_type"]),
+        UNIFORM_SCORES[labels["post_type"]]
+    )
+    for language, labels in LABELS_BY_LANG.items()
+}
+DEFAULT_POLITICAL_SCORES: Dict[str, Mapping[str, float]] = {
+    language: UNIFORM_SCORES[labels["political"]]
+    for language, labels in LABELS_BY_LANG.items()
+}
+DEFAULT_INTENT_SCORES: Dict[str, Mapping[str, float]] = {
+    language: UNIFORM_SCORES[labels["intent"]]
+    for language, labels in LABELS_BY_LANG.items()
+}
+
+
+def _freeze(value: Any) -> Any:
+    # Cached results are shared between requests, so they are handed out read-only
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
 
 class ClaudeService:
 
     def __init__(self) -> None:
+        self._cache: TTLCache = TTLCache(maxsize=10_000, ttl=3600)
+        self._inflight: Dict[bytes, asyncio.Task] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.coalesced_calls = 0
+
         if not settings.ANTHROPIC_API_KEY:
             logger.warning("No Anthropic API key provided. Claude analysis will be disabled.")
             self.client = None
             self.enabled = False
         else:
-            self.client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+            self.client = AsyncAnthropic(
+                api_key=settings.ANTHROPIC_API_KEY,
+                max_retries=0,
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+                )
+            )
             self.enabled = True
             logger.info("Claude service initialized successfully")
 
+    def cache_stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._cache),
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "coalesced": self.coalesced_calls
+        }
+
+    async def close(self) -> None:
+        if self.client is not None:
+            await self.client.close()
+
+    async def ping(self) -> None:
+        # Bypasses the result cache and retries so the deep health check reaches the API
+        if not self.enabled:
+            return
+        await self._make_api_call("ping", 1, max_retries=1)
+
     async def classify_post_type(
         self,
         text: str,
         language: str = "en"
-    ) -> Tuple[str, float, Dict[str, float]]:
+    ) -> Tuple[str, float, Mapping[str, float]]:
 
         if not self.enabled:
             logger.warning("Claude service not enabled, using default classification")
@@ -33,10 +379,13 @@ class ClaudeService:
         labels = self._get_post_type_labels(language)
 
         try:
-            prompt = self._build_classification_prompt(text, labels, language)
-            response = self._make_api_call(prompt)
-            result = self._parse_classification_response(response, labels)
-            return result
+            prompt = self._build_prompt("classify", text, language)
+            return await self._cached_call(
+                prompt,
+                lambda response: self._parse_streamed_classification_response(response, labels),
+                MAX_TOKENS["classify"],
+                stop_when=self._classification_decoded
+            )
 
         except Exception as e:
             logger.error(f"Error in Claude classification: {e}")
@@ -46,7 +395,7 @@ class ClaudeService:
         self,
         text: str,
         language: str = "en"
-    ) -> Dict[str, float]:
+    ) -> Mapping[str, float]:
 
         if not self.enabled:
             logger.warning("Claude service not enabled, using default political analysis")
@@ -55,9 +404,12 @@ class ClaudeService:
         labels = self._get_political_labels(language)
 
         try:
-            prompt = self._build_political_analysis_prompt(text, labels, language)
-            response = self._make_api_call(prompt)
-            return self._parse_political_response(response, labels)
+            prompt = self._build_prompt("political", text, language)
+            return await self._cached_call(
+                prompt,
+                lambda response: self._parse_political_response(response, labels),
+                MAX_TOKENS["political"]
+            )
 
         except Exception as e:
             logger.error(f"Error in Claude political analysis: {e}")
@@ -67,7 +419,7 @@ class ClaudeService:
         self,
         text: str,
         language: str = "en"
-    ) -> Dict[str, float]:
+    ) -> Mapping[str, float]:
 
         if not self.enabled:
             logger.warning("Claude service not enabled, using default intent analysis")
@@ -76,9 +428,12 @@ class ClaudeService:
         labels = self._get_intent_labels(language)
 
         try:
-            prompt = self._build_intent_analysis_prompt(text, labels, language)
-            response = self._make_api_call(prompt)
-            return self._parse_intent_response(response, labels)
+            prompt = self._build_prompt("intent", text, language)
+            return await self._cached_call(
+                prompt,
+                lambda response: self._parse_intent_response(response, labels),
+                MAX_TOKENS["intent"]
+            )
 
         except Exception as e:
             logger.error(f"Error in Claude intent analysis: {e}")
@@ -95,281 +450,374 @@ class ClaudeService:
             return self._get_default_veracity_analysis(claim, language)
 
         try:
-            prompt = self._build_veracity_prompt(claim, language)
-            response = self._make_api_call(prompt)
-            return self._parse_veracity_response(response)
+            prompt = self._build_prompt("veracity", claim, language)
+            return await self._cached_call(
+                prompt, self._parse_veracity_response, MAX_TOKENS["veracity"]
+            )
 
         except Exception as e:
             logger.error(f"Error in Claude veracity analysis: {e}")
             return self._get_default_veracity_analysis(claim, language)
 
-    def _make_api_call(self, prompt: str, max_retries: int = 3) -> str:
+    async def analyze_combined(
+        self,
+        text: str,
+        language: str = "en"
+    ) -> Tuple[Tuple[str, float, Mapping[str, float]], Mapping[str, float], Mapping[str, float]]:
 
-        for attempt in range(max_retries):
-            try:
-                response = self.client.messages.create(
-                    model=settings.CLAUDE_MODEL,
-                    max_tokens=1000,
-                    temperature=0.1,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                return response.content[0].text
+        if not self.enabled:
+            logger.warning("Claude service not enabled, using default combined analysis")
+            return self._get_default_combined_analysis(language)
 
-            except Exception as e:
-                logger.warning(f"API call attempt {attempt + 1} failed: {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)
-                else:
-                    raise e
+        post_type_labels = self._get_post_type_labels(language)
+        political_labels = self._get_political_labels(language)
+        intent_labels = self._get_intent_labels(language)
 
-    def _build_classification_prompt(
-        self,
-        text: str,
-        labels: List[str],
-        language: str
-    ) -> str:
-        if language == "de":
-            return f"""
-Klassifiziere den folgenden Text in eine der Kategorien: {', '.join(labels)}
+        try:
+            prompt = self._build_prompt("combined", text, language)
+            return await self._cached_call(
+                prompt,
+                lambda response: self._parse_combined_response(
+                    response, post_type_labels, political_labels, intent_labels
+                ),
+                MAX_TOKENS["combined"]
+            )
+
+        except PARSE_ERRORS as e:
+            logger.error(f"Error parsing Claude combined analysis, falling back to separate calls: {e}")
+            return tuple(await asyncio.gather(
+                self.classify_post_type(text, language),
+                self.analyze_political_tendency(text, language),
+                self.analyze_intents(text, language)
+            ))
 
-Text: "{text}"
+        except Exception as e:
+            logger.error(f"Error in Claude combined analysis: {e}")
+            return self._get_default_combined_analysis(language)
 
-Antworte nur mit einem JSON-Objekt im folgenden Format:
-{{
-    "primary_label": "gewählte_kategorie",
-    "confidence": 0.95,
-    "scores": {{
-        "kategorie1": 0.95,
-        "kategorie2": 0.03,
-        "kategorie3": 0.02
-    }}
-}}
-"""
-        else:
-            return f"""
-Classify the following text into one of these categories: {', '.join(labels)}
+    async def analyze_combined_batch(
+        self,
+        texts: List[str],
+        language: str = "en"
+    ) -> List[Tuple[Tuple[str, float, Mapping[str, float]], Mapping[str, float], Mapping[str, float]]]:
 
-Text: "{text}"
+        if not self.enabled:
+            logger.warning("Claude service not enabled, using default combined analysis")
+            return [await self.analyze_combined(text, language) for text in texts]
 
-Respond only with a JSON object in the following format:
-{{
-    "primary_label": "chosen_category",
-    "confidence": 0.95,
-    "scores": {{
-        "category1": 0.95,
-        "category2": 0.03,
-        "category3": 0.02
-    }}
-}}
-"""
+        chunks = await asyncio.gather(*(
+            self._analyze_combined_chunk(texts[start:start + BATCH_CHUNK_SIZE], language)
+            for start in range(0, len(texts), BATCH_CHUNK_SIZE)
+        ))
+        return [result for chunk in chunks for result in chunk]
 
-    def _build_political_analysis_prompt(
+    async def _analyze_combined_chunk(
         self,
-        text: str,
-        labels: List[str],
+        texts: List[str],
         language: str
-    ) -> str:
-        if language == "de":
-            return f"""
-Analysiere die politische Tendenz des folgenden Textes: {', '.join(labels)}
-
-Text: "{text}"
+    ) -> List[Tuple[Tuple[str, float, Mapping[str, float]], Mapping[str, float], Mapping[str, float]]]:
 
-Antworte nur mit einem JSON-Objekt im folgenden Format:
-{{
-    "scores": {{
-        "kategorie1": 0.95,
-        "kategorie2": 0.03,
-        "kategorie3": 0.02
-    }}
-}}
-"""
-        else:
-            return f"""
-Analyze the political tendency of the following text: {', '.join(labels)}
+        post_type_labels = self._get_post_type_labels(language)
+        political_labels = self._get_political_labels(language)
+        intent_labels = self._get_intent_labels(language)
 
-Text: "{text}"
+        try:
+            prompt = self._build_batch_prompt("combined_batch", texts, language)
+            results = await self._cached_call(
+                prompt,
+                lambda response: self._parse_combined_batch_response(
+                    response, len(texts), post_type_labels, political_labels, intent_labels
+                ),
+                min(MAX_TOKENS["combined_batch"] * len(texts), MODEL_MAX_OUTPUT_TOKENS)
+            )
+
+        except PARSE_ERRORS as e:
+            logger.error(f"Error parsing Claude batch analysis, falling back to per-post calls: {e}")
+            results = {}
 
-Respond only with a JSON object in the following format:
-{{
-    "scores": {{
-        "category1": 0.95,
-        "category2": 0.03,
-        "category3": 0.02
-    }}
-}}
-"""
+        except Exception as e:
+            logger.error(f"Error in Claude batch analysis: {e}")
+            return [self._get_default_combined_analysis(language)] * len(texts)
 
-    def _build_intent_analysis_prompt(
-        self,
-        text: str,
-        labels: List[str],
-        language: str
-    ) -> str:
-        if language == "de":
-            return f"""
-Analysiere die Absichten im folgenden Text: {', '.join(labels)}
+        missing = [index for index in range(1, len(texts) + 1) if index not in results]
+        if missing:
+            fallbacks = await asyncio.gather(*(
+                self.analyze_combined(texts[index - 1], language) for index in missing
+            ))
+            results = {**results, **dict(zip(missing, fallbacks))}
 
-Text: "{text}"
+        return [results[index] for index in range(1, len(texts) + 1)]
 
-Antworte nur mit einem JSON-Objekt im folgenden Format:
-{{
-    "scores": {{
-        "kategorie1": 0.95,
-        "kategorie2": 0.03,
-        "kategorie3": 0.02
-    }}
-}}
-"""
+    async def _cached_call(
+        self,
+        prompt: str,
+        parse: Callable[[str], Any],
+        max_tokens: int,
+        stop_when: Optional[Callable[[str], bool]] = None
+    ) -> Any:
+        key = self._cache_key(prompt)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            self.cache_misses += 1
+            # The fill runs as its own task so cancelling one caller does not cancel the others
+            inflight = asyncio.ensure_future(
+                self._fill_cache(key, prompt, parse, max_tokens, stop_when)
+            )
+            # Retrieve a failure even if every caller was cancelled, so it is not logged as unhandled
+            inflight.add_done_callback(lambda task: task.cancelled() or task.exception())
+            self._inflight[key] = inflight
         else:
-            return f"""
-Analyze the intents in the following text: {', '.join(labels)}
+            self.coalesced_calls += 1
 
-Text: "{text}"
+        return await asyncio.shield(inflight)
 
-Respond only with a JSON object in the following format:
-{{
-    "scores": {{
-        "category1": 0.95,
-        "category2": 0.03,
-        "category3": 0.02
-    }}
-}}
-"""
+    async def _fill_cache(
+        self,
+        key: bytes,
+        prompt: str,
+        parse: Callable[[str], Any],
+        max_tokens: int,
+        stop_when: Optional[Callable[[str], bool]]
+    ) -> Any:
+        try:
+            result = _freeze(parse(await self._make_api_call(prompt, max_tokens, stop_when)))
+            self._cache[key] = result
+            return result
+        finally:
+            del self._inflight[key]
 
-    def _build_veracity_prompt(
+    def _cache_key(self, prompt: str) -> bytes:
+        return blake2b(
+            f"{settings.CLAUDE_MODEL}\0{prompt}".encode(),
+            digest_size=16
+        ).digest()
+
+    async def _make_api_call(
         self,
-        claim: str,
-        language: str
+        prompt: str,
+        max_tokens: int,
+        stop_when: Optional[Callable[[str], bool]] = None,
+        max_retries: int = 3
     ) -> str:
-        if language == "de":
-            return f"""
-Du bist ein neutraler, unparteiischer deutscher Faktenchecker. Bewerte die folgende Behauptung basierend auf deinem Wissen.
 
-Behauptung: "{claim}"
+        for attempt in range(max_retries):
+            try:
+                if stop_when is not None:
+                    return await self._stream_until(prompt, max_tokens, stop_when)
 
-Antworte nur mit einem JSON-Objekt im folgenden Format:
-{{
-    "status": "Factually Correct|Untruth|Misleading|Unverifiable",
-    "justification": "Kurze Begründung",
-    "verification_method": "AI-basierte Analyse"
-}}
-"""
-        else:
-            return f"""
-You are a neutral, impartial fact-checker. Evaluate the following claim based on your knowledge.
+                response = await self.client.messages.create(
+                    model=settings.CLAUDE_MODEL,
+                    max_tokens=max_tokens,
+                    temperature=0.1,
+                    system=SYSTEM_PROMPT,
+                    messages=[
+                        {"role": "user", "content": prompt},
+                        {"role": "assistant", "content": JSON_PREFILL}
+                    ]
+                )
+                return JSON_PREFILL + response.content[0].text
 
-Claim: "{claim}"
+            except Exception as e:
+                logger.warning(f"API call attempt {attempt + 1} failed: {e}")
+                if (
+                    isinstance(e, APIStatusError)
+                    and e.status_code < 500
+                    and e.status_code not in RETRYABLE_CLIENT_ERRORS
+                ):
+                    raise e
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(2 ** attempt)
+                else:
+                    raise e
 
-Respond only with a JSON object in the following format:
-{{
-    "status": "Factually Correct|Untruth|Misleading|Unverifiable",
-    "justification": "Brief justification",
-    "verification_method": "AI-based analysis"
-}}
-"""
+    async def _stream_until(
+        self,
+        prompt: str,
+        max_tokens: int,
+        stop_when: Callable[[str], bool]
+    ) -> str:
+        text = JSON_PREFILL
+        async with self.client.messages.stream(
+            model=settings.CLAUDE_MODEL,
+            max_tokens=max_tokens,
+            temperature=0.1,
+            system=SYSTEM_PROMPT,
+            messages=[
+                {"role": "user", "content": prompt},
+                {"role": "assistant", "content": JSON_PREFILL}
+            ]
+        ) as stream:
+            async for event in stream:
+                if event.type != "content_block_delta":
+                    continue
+                text += event.delta.text
+                if stop_when(text):
+                    break
+
+        return text
+
+    def _build_batch_prompt(self, kind: str, texts: List[str], language: str) -> str:
+        prefix, suffix = PROMPT_TEMPLATES[(kind, self._normalize_language(language))]
+        numbered = "".join(f'{index}. "{text}"\n' for index, text in enumerate(texts, 1))
+        return f"{prefix}{numbered}{suffix}"
+
+    def _classification_decoded(self, text: str) -> bool:
+        return (
+            PRIMARY_LABEL_PATTERN.search(text) is not None
+            and CONFIDENCE_PATTERN.search(text) is not None
+        )
+
+    def _build_prompt(self, kind: str, text: str, language: str) -> str:
+        prefix, suffix = PROMPT_TEMPLATES[(kind, self._normalize_language(language))]
+        return f'{prefix}"{text}"\n{suffix}'
 
     def _parse_classification_response(
         self,
         response_text: str,
-        labels: List[str]
-    ) -> Tuple[str, float, Dict[str, float]]:
-        try:
-            data = json.loads(response_text)
-            primary_label = data.get("primary_label", labels[0])
-            confidence = data.get("confidence", 0.5)
-            scores = data.get("scores", {})
+        labels: Tuple[str, ...]
+    ) -> Tuple[str, float, Mapping[str, float]]:
+        data = orjson.loads(response_text)
+        primary_label = data.get("primary_label", labels[0])
+        confidence = data.get("confidence", 0.5)
+        scores = {**ZERO_SCORES[labels], **(data.get("scores") or {})}
 
-            for label in labels:
-                if label not in scores:
-                    scores[label] = 0.0
+        return primary_label, confidence, scores
 
-            return primary_label, confidence, scores
-
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"Error parsing classification response: {e}")
-            return labels[0], 0.5, {label: 1.0 / len(labels) for label in labels}
+    def _parse_streamed_classification_response(
+        self,
+        response_text: str,
+        labels: Tuple[str, ...]
+    ) -> Tuple[str, float, Mapping[str, float]]:
+        label_match = PRIMARY_LABEL_PATTERN.search(response_text)
+        confidence_match = CONFIDENCE_PATTERN.search(response_text)
+        if label_match is None or confidence_match is None:
+            return self._parse_classification_response(response_text, labels)
+
+        primary_label = label_match.group(1)
+        if primary_label in labels:
+            scores = {**ZERO_SCORES[labels], primary_label: 1.0}
+        else:
+            scores = UNIFORM_SCORES[labels]
+        return primary_label, float(confidence_match.group(1)), scores
 
     def _parse_political_response(
         self,
         response_text: str,
-        labels: List[str]
-    ) -> Dict[str, float]:
-        try:
-            data = json.loads(response_text)
-            scores = data.get("scores", {})
-
-            for label in labels:
-                if label not in scores:
-                    scores[label] = 0.0
-
-            return scores
-
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"Error parsing political response: {e}")
-            return {label: 1.0 / len(labels) for label in labels}
+        labels: Tuple[str, ...]
+    ) -> Mapping[str, float]:
+        data = orjson.loads(response_text)
+        return {**ZERO_SCORES[labels], **(data.get("scores") or {})}
 
     def _parse_intent_response(
         self,
         response_text: str,
-        labels: List[str]
-    ) -> Dict[str, float]:
-        try:
-            data = json.loads(response_text)
-            scores = data.get("scores", {})
+        labels: Tuple[str, ...]
+    ) -> Mapping[str, float]:
+        data = orjson.loads(response_text)
+        return {**ZERO_SCORES[labels], **(data.get("scores") or {})}
 
-            for label in labels:
-                if label not in scores:
-                    scores[label] = 0.0
+    def _parse_combined_response(
+        self,
+        response_text: str,
+        post_type_labels: Tuple[str, ...],
+        political_labels: Tuple[str, ...],
+        intent_labels: Tuple[str, ...]
+    ) -> Tuple[Tuple[str, float, Mapping[str, float]], Mapping[str, float], Mapping[str, float]]:
+        return self._parse_combined_data(
+            orjson.loads(response_text), post_type_labels, political_labels, intent_labels
+        )
 
-            return scores
+    def _parse_combined_batch_response(
+        self,
+        response_text: str,
+        count: int,
+        post_type_labels: Tuple[str, ...],
+        political_labels: Tuple[str, ...],
+        intent_labels: Tuple[str, ...]
+    ) -> Dict[int, Tuple[Tuple[str, float, Mapping[str, float]], Mapping[str, float], Mapping[str, float]]]:
+        results = {}
+        for item in orjson.loads(response_text)["results"]:
+            try:
+                index = int(item["id"])
+                if not 1 <= index <= count or index in results:
+                    logger.error(f"Ignoring out-of-range or duplicate batch result id {index}")
+                    continue
+                results[index] = self._parse_combined_data(
+                    item, post_type_labels, political_labels, intent_labels
+                )
+            except (KeyError, TypeError, ValueError, AttributeError) as e:
+                logger.error(f"Error parsing batch result {item!r}: {e}")
+        return results
 
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"Error parsing intent response: {e}")
-            return {label: 1.0 / len(labels) for label in labels}
+    def _parse_combined_data(
+        self,
+        data: Dict[str, Any],
+        post_type_labels: Tuple[str, ...],
+        political_labels: Tuple[str, ...],
+        intent_labels: Tuple[str, ...]
+    ) -> Tuple[Tuple[str, float, Mapping[str, float]], Mapping[str, float], Mapping[str, float]]:
+        post_type = data["post_type"]
+
+        post_type_scores = {
+            **ZERO_SCORES[post_type_labels], **(post_type.get("scores") or {})
+        }
+        political_scores = {
+            **ZERO_SCORES[political_labels], **(data["political"].get("scores") or {})
+        }
+        intent_scores = {
+            **ZERO_SCORES[intent_labels], **(data["intents"].get("scores") or {})
+        }
+
+        classification = (
+            post_type.get("primary_label", post_type_labels[0]),
+            post_type.get("confidence", 0.5),
+            post_type_scores
+        )
+        return classification, political_scores, intent_scores
 
     def _parse_veracity_response(self, response_text: str) -> Tuple[str, str, str]:
-        try:
-            data = json.loads(response_text)
-            status = data.get("status", "Unverifiable")
-            justification = data.get("justification", "No analysis available")
-            verification_method = data.get("verification_method", "No method specified")
+        data = orjson.loads(response_text)
+        status = data.get("status", "Unverifiable")
+        justification = data.get("justification", "No analysis available")
+        verification_method = data.get("verification_method", "No method specified")
 
-            return status, justification, verification_method
+        return status, justification, verification_method
 
-        except (json.JSONDecodeError, KeyError) as e:
-            logger.error(f"Error parsing veracity response: {e}")
-            return "Unverifiable", "Error in analysis", "No method available"
+    def _normalize_language(self, language: str) -> str:
+        return "de" if language == "de" else "en"
 
-    def _get_post_type_labels(self, language: str) -> List[str]:
-        return settings.DE_POST_TYPES if language == "de" else settings.EN_POST_TYPES
+    def _get_post_type_labels(self, language: str) -> Tuple[str, ...]:
+        return LABELS_BY_LANG[self._normalize_language(language)]["post_type"]
 
-    def _get_political_labels(self, language: str) -> List[str]:
-        return (
-            settings.DE_POLITICAL_LABELS
-            if language == "de"
-            else settings.EN_POLITICAL_LABELS
-        )
+    def _get_political_labels(self, language: str) -> Tuple[str, ...]:
+        return LABELS_BY_LANG[self._normalize_language(language)]["political"]
 
-    def _get_intent_labels(self, language: str) -> List[str]:
-        return (
-            settings.DE_INTENT_LABELS
-            if language == "de"
-            else settings.EN_INTENT_LABELS
-        )
+    def _get_intent_labels(self, language: str) -> Tuple[str, ...]:
+        return LABELS_BY_LANG[self._normalize_language(language)]["intent"]
 
-    def _get_default_classification(self, language: str) -> Tuple[str, float, Dict[str, float]]:
-        labels = self._get_post_type_labels(language)
-        scores = {label: 1.0 / len(labels) for label in labels}
-        return labels[0], 1.0 / len(labels), scores
+    def _get_default_classification(self, language: str) -> Tuple[str, float, Mapping[str, float]]:
+        return DEFAULT_CLASSIFICATIONS[self._normalize_language(language)]
 
-    def _get_default_political_analysis(self, language: str) -> Dict[str, float]:
-        labels = self._get_political_labels(language)
-        return {label: 1.0 / len(labels) for label in labels}
+    def _get_default_political_analysis(self, language: str) -> Mapping[str, float]:
+        return DEFAULT_POLITICAL_SCORES[self._normalize_language(language)]
 
-    def _get_default_intent_analysis(self, language: str) -> Dict[str, float]:
-        labels = self._get_intent_labels(language)
-        return {label: 1.0 / len(labels) for label in labels}
+    def _get_default_intent_analysis(self, language: str) -> Mapping[str, float]:
+        return DEFAULT_INTENT_SCORES[self._normalize_language(language)]
+
+    def _get_default_combined_analysis(
+        self,
+        language: str
+    ) -> Tuple[Tuple[str, float, Mapping[str, float]], Mapping[str, float], Mapping[str, float]]:
+        return (
+            self._get_default_classification(language),
+            self._get_default_political_analysis(language),
+            self._get_default_intent_analysis(language)
+        )
 
     def _get_default_veracity_analysis(
         self,
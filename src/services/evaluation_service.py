@@ -1,15 +1,87 @@
+import asyncio
 import logging
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Mapping, Tuple, Optional
 from datetime import datetime, timezone
-from ..config import settings
+from ..config import (
+    ENABLE_NUANCE, ENABLE_VERACITY, INTENT_THRESHOLD, SPAM_THRESHOLD
+)
 from ..models.api_models import (
     PostType, VeracityStatus, PoliticalTendency, Intent,
-    PostAnalysis, VeracityAnalysis, PoliticalTendencyAnalysis, NuanceAnalysis
+    PostAnalysis, PoliticalTendencyAnalysis, NuanceAnalysis
 )
 from .claude_service import ClaudeService
 
 logger = logging.getLogger(__name__)
-SPAM_LABELS = ["Werbung / Spam", "Promotion"]
+SPAM_LABELS = frozenset({"Werbung / Spam", "Promotion"})
+
+_VERACITY_MAP = {
+    "Factually Correct": VeracityStatus.FACTUALLY_CORRECT,
+    "Untruth": VeracityStatus.UNTRUTH,
+    "Misleading": VeracityStatus.MISLEADING,
+    "Unverifiable": VeracityStatus.UNVERIFIABLE
+}
+
+_POST_TYPE_MAP = {
+    "Factual Claim": PostType.FACTUAL_CLAIM,
+    "Faktische Behauptung": PostType.FACTUAL_CLAIM,
+    "Opinion": PostType.OPINION,
+    "Meinungsäußerung": PostType.OPINION,
+    "Question": PostType.QUESTION,
+    "Frage": PostType.QUESTION,
+    "Personal Update": PostType.PERSONAL_UPDATE,
+    "Persönliche Mitteilung": PostType.PERSONAL_UPDATE,
+    "Promotion": PostType.PROMOTION,
+    "Werbung / Spam": PostType.PROMOTION
+}
+
+_POLITICAL_MAP = {
+    "Left": PoliticalTendency.LEFT,
+    "Politisch Links": PoliticalTendency.LEFT,
+    "Center-Left": PoliticalTendency.CENTER_LEFT,
+    "Politisch Mitte-Links": PoliticalTendency.CENTER_LEFT,
+    "Center": PoliticalTendency.CENTER,
+    "Politisch Mitte": PoliticalTendency.CENTER,
+    "Center-Right": PoliticalTendency.CENTER_RIGHT,
+    "Politisch Mitte-Rechts": PoliticalTendency.CENTER_RIGHT,
+    "Right": PoliticalTendency.RIGHT,
+    "Politisch Rechts": PoliticalTendency.RIGHT,
+    "Neutral": PoliticalTendency.NEUTRAL,
+    "Politisch Neutral": PoliticalTendency.NEUTRAL
+}
+
+_INTENT_MAP = {
+    "Informative": Intent.INFORMATIVE,
+    "Informativ": Intent.INFORMATIVE,
+    "Persuasive": Intent.PERSUASIVE,
+    "Überzeugend": Intent.PERSUASIVE,
+    "Satirical": Intent.SATIRICAL,
+    "Satirisch": Intent.SATIRICAL,
+    "Provocative": Intent.PROVOCATIVE,
+    "Provozierend": Intent.PROVOCATIVE,
+    "Commercial": Intent.COMMERCIAL,
+    "Kommerziell": Intent.COMMERCIAL,
+    "Entertaining": Intent.ENTERTAINING,
+    "Unterhaltend": Intent.ENTERTAINING
+}
+
+_ERROR_FALLBACK = {
+    "post_analysis": PostAnalysis(
+        post_type=PostType.OPINION,
+        is_spam=False
+    ).model_dump(mode="json"),
+    "veracity_analysis": None,
+    "nuance_analysis": NuanceAnalysis(
+        political_tendency=PoliticalTendencyAnalysis(
+            primary=PoliticalTendency.NEUTRAL,
+            scores={"Neutral": 1.0}
+        ),
+        detected_intents=[Intent.INFORMATIVE]
+    ).model_dump(mode="json")
+}
+
+
+def utc_timestamp() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
 
 
 class AdvancedEvaluationService:
@@ -25,54 +97,117 @@ class AdvancedEvaluationService:
         language: str = "en"
     ) -> Dict:
 
-        processing_error = None
+        timestamp = utc_timestamp()
 
         try:
-            post_type, is_spam = await self._run_triage(post_text, language)
+            classification, political_scores, intent_scores = await self._run_combined_analysis(
+                post_text, language
+            )
+        except Exception as e:
+            return self._build_error_response(post_id, timestamp, language, e)
+
+        return await self._complete_analysis(
+            post_id, post_text, language, timestamp,
+            classification, political_scores, intent_scores
+        )
+
+    async def perform_batch_analysis(
+        self,
+        posts: List[Tuple[str, str, str]]
+    ) -> List[Dict]:
+
+        timestamp = utc_timestamp()
 
-            veracity_analysis = await self._get_veracity_analysis(
-                post_type, is_spam, post_text, language
+        indices_by_language: Dict[str, List[int]] = {}
+        for index, (_, _, language) in enumerate(posts):
+            indices_by_language.setdefault(language, []).append(index)
+
+        try:
+            grouped_results = await asyncio.gather(*(
+                self.claude_service.analyze_combined_batch(
+                    [posts[index][1] for index in indices], language
+                )
+                for language, indices in indices_by_language.items()
+            ))
+        except Exception as e:
+            return [
+                self._build_error_response(post_id, timestamp, language, e)
+                for post_id, _, language in posts
+            ]
+
+        combined_results: Dict[int, Tuple] = {}
+        for indices, results in zip(indices_by_language.values(), grouped_results):
+            combined_results.update(zip(indices, results))
+
+        return list(await asyncio.gather(*(
+            self._complete_analysis(
+                post_id, post_text, language, timestamp, *combined_results[index]
             )
+            for index, (post_id, post_text, language) in enumerate(posts)
+        )))
 
-            nuance_analysis = await self._get_nuance_analysis(
-                is_spam, post_text, language
+    async def _complete_analysis(
+        self,
+        post_id: str,
+        post_text: str,
+        language: str,
+        timestamp: str,
+        classification: Tuple[str, float, Mapping[str, float]],
+        political_scores: Optional[Mapping[str, float]],
+        intent_scores: Optional[Mapping[str, float]]
+    ) -> Dict:
+
+        processing_error = None
+
+        try:
+            post_type, is_spam = self._run_triage(classification)
+
+            try:
+                veracity_analysis = await self._get_veracity_analysis(
+                    post_type, is_spam, post_text, language
+                )
+            except Exception as e:
+                logger.error(f"Veracity analysis failed for post {post_id}: {e}")
+                processing_error = f"Veracity analysis failed: {str(e)}"
+                veracity_analysis = None
+
+            nuance_analysis = self._get_nuance_analysis(
+                is_spam, political_scores, intent_scores
             )
 
         except Exception as e:
-            logger.error(f"Analysis failed for post {post_id}: {e}")
-            processing_error = f"Analysis failed: {str(e)}"
-            return {
-                "post_id": post_id,
-                "analysis_timestamp": datetime.now(timezone.utc).isoformat() + "Z",
-                "language": language,
-                "post_analysis": PostAnalysis(
-                    post_type=PostType.OPINION,
-                    is_spam=False
-                ),
-                "veracity_analysis": None,
-                "nuance_analysis": NuanceAnalysis(
-                    political_tendency=PoliticalTendencyAnalysis(
-                        primary=PoliticalTendency.NEUTRAL,
-                        scores={"Neutral": 1.0}
-                    ),
-                    detected_intents=[Intent.INFORMATIVE]
-                ),
-                "processing_error": processing_error
-            }
+            return self._build_error_response(post_id, timestamp, language, e)
 
         return self._build_analysis_response(
-            post_id, language, post_type, is_spam,
+            post_id, timestamp, language, post_type, is_spam,
             veracity_analysis, nuance_analysis, processing_error
         )
 
-    async def _run_triage(self, text: str, language: str) -> Tuple[PostType, bool]:
+    async def _run_combined_analysis(
+        self,
+        text: str,
+        language: str
+    ) -> Tuple[
+        Tuple[str, float, Mapping[str, float]],
+        Optional[Mapping[str, float]],
+        Optional[Mapping[str, float]]
+    ]:
 
-        primary_label, confidence, scores = await self.claude_service.classify_post_type(
-            text, language
-        )
+        if not ENABLE_NUANCE:
+            classification = await self.claude_service.classify_post_type(text, language)
+            return classification, None, None
+
+        return await self.claude_service.analyze_combined(text, language)
+
+    def _run_triage(
+        self,
+        classification: Tuple[str, float, Mapping[str, float]]
+    ) -> Tuple[PostType, bool]:
+
+        primary_label, confidence, scores = classification
 
         is_spam = self._detect_spam(primary_label, confidence)
-        post_type = self._map_to_post_type(primary_label, language)
+        post_type = self._map_to_post_type(primary_label)
 
         logger.info(f"AI triage: {post_type}, spam: {is_spam}, confidence: {confidence:.2f}")
         return post_type, is_spam
@@ -83,7 +218,7 @@ class AdvancedEvaluationService:
         is_spam: bool,
         post_text: str,
         language: str
-    ) -> Optional[VeracityAnalysis]:
+    ) -> Optional[Dict]:
 
         if not self._should_perform_veracity_check(post_type, is_spam):
             return None
@@ -92,37 +227,30 @@ class AdvancedEvaluationService:
             post_text, language
         )
 
-        return VeracityAnalysis(
-            status=self._map_veracity_status(status),
-            justification=justification,
-            verification_method=verification_method,
-            sources=[]
-        )
+        return {
+            "status": self._map_veracity_status(status).value,
+            "justification": justification,
+            "verification_method": verification_method,
+            "sources": []
+        }
 
-    async def _get_nuance_analysis(
+    def _get_nuance_analysis(
         self,
         is_spam: bool,
-        post_text: str,
-        language: str
-    ) -> Optional[NuanceAnalysis]:
+        political_scores: Optional[Mapping[str, float]],
+        intent_scores: Optional[Mapping[str, float]]
+    ) -> Optional[Dict]:
 
-        if is_spam or not settings.ENABLE_NUANCE_ANALYSIS:
+        if is_spam or not ENABLE_NUANCE:
             return None
 
-        political_scores = await self.claude_service.analyze_political_tendency(
-            post_text, language
-        )
-        intent_scores = await self.claude_service.analyze_intents(
-            post_text, language
-        )
+        political_analysis = self._build_political_analysis(political_scores)
+        detected_intents = self._build_intent_list(intent_scores)
 
-        political_analysis = self._build_political_analysis(political_scores, language)
-        detected_intents = self._build_intent_list(intent_scores, language)
-
-        return NuanceAnalysis(
-            political_tendency=political_analysis,
-            detected_intents=detected_intents
-        )
+        return {
+            "political_tendency": political_analysis,
+            "detected_intents": detected_intents
+        }
 
     def _should_perform_veracity_check(
         self,
@@ -132,123 +260,85 @@ class AdvancedEvaluationService:
         return (
             post_type == PostType.FACTUAL_CLAIM
             and not is_spam
-            and settings.ENABLE_VERACITY_CHECK
+            and ENABLE_VERACITY
         )
 
     def _detect_spam(self, primary_label: str, confidence: float) -> bool:
-        is_promotion_label = primary_label in SPAM_LABELS
-        high_promotion_score = confidence > settings.SPAM_CONFIDENCE_THRESHOLD
-        return is_promotion_label and high_promotion_score
+        return primary_label in SPAM_LABELS and confidence > SPAM_THRESHOLD
 
-    def _build_political_analysis(
-        self,
-        scores: Dict[str, float],
-        language: str
-    ) -> PoliticalTendencyAnalysis:
-        primary_label = max(scores, key=scores.get)
+    def _build_political_analysis(self, scores: Mapping[str, float]) -> Dict:
+        rounded_scores = {}
+        primary_label, primary_score = None, float("-inf")
+        for label, score in scores.items():
+            rounded_scores[label] = round(score, 4)
+            if score > primary_score:
+                primary_label, primary_score = label, score
 
-        return PoliticalTendencyAnalysis(
-            primary=self._map_to_political_tendency(primary_label, language),
-            scores={k: round(v, 4) for k, v in scores.items()}
-        )
+        return {
+            "primary": self._map_to_political_tendency(primary_label).value,
+            "scores": rounded_scores
+        }
 
-    def _build_intent_list(
-        self,
-        scores: Dict[str, float],
-        language: str
-    ) -> List[Intent]:
+    def _build_intent_list(self, scores: Mapping[str, float]) -> List[str]:
         detected_intents = [
             intent for intent, score in scores.items()
-            if score > settings.INTENT_CONFIDENCE_THRESHOLD
+            if score > INTENT_THRESHOLD
         ]
 
         return [
-            self._map_to_intent(intent, language)
+            self._map_to_intent(intent).value
             for intent in detected_intents
         ]
 
     def _build_analysis_response(
         self,
         post_id: str,
+        timestamp: str,
         language: str,
         post_type: PostType,
         is_spam: bool,
-        veracity_analysis: Optional[VeracityAnalysis],
-        nuance_analysis: Optional[NuanceAnalysis],
+        veracity_analysis: Optional[Dict],
+        nuance_analysis: Optional[Dict],
         processing_error: Optional[str] = None
     ) -> Dict:
 
         return {
             "post_id": post_id,
-            "analysis_timestamp": datetime.now(timezone.utc).isoformat() + "Z",
+            "analysis_timestamp": timestamp,
             "language": language,
-            "post_analysis": PostAnalysis(
-                post_type=post_type,
-                is_spam=is_spam
-            ),
+            "post_analysis": {
+                "post_type": post_type.value,
+                "is_spam": is_spam
+            },
             "veracity_analysis": veracity_analysis,
             "nuance_analysis": nuance_analysis,
             "processing_error": processing_error
         }
 
-    def _map_veracity_status(self, status: str) -> VeracityStatus:
-        mapping = {
-            "Factually Correct": VeracityStatus.FACTUALLY_CORRECT,
-            "Untruth": VeracityStatus.UNTRUTH,
-            "Misleading": VeracityStatus.MISLEADING,
-            "Unverifiable": VeracityStatus.UNVERIFIABLE
-        }
-        return mapping.get(status, VeracityStatus.UNVERIFIABLE)
-
-    def _map_to_post_type(self, label: str, language: str) -> PostType:
-        mapping = {
-            "Factual Claim": PostType.FACTUAL_CLAIM,
-            "Faktische Behauptung": PostType.FACTUAL_CLAIM,
-            "Opinion": PostType.OPINION,
-            "Meinungsäußerung": PostType.OPINION,
-            "Question": PostType.QUESTION,
-            "Frage": PostType.QUESTION,
-            "Personal Update": PostType.PERSONAL_UPDATE,
-            "Persönliche Mitteilung": PostType.PERSONAL_UPDATE,
-            "Promotion": PostType.PROMOTION,
-            "Werbung / Spam": PostType.PROMOTION
-        }
-        return mapping.get(label, PostType.OPINION)
-
-    def _map_to_political_tendency(
+    def _build_error_response(
         self,
-        label: str,
-        language: str
-    ) -> PoliticalTendency:
-        mapping = {
-            "Left": PoliticalTendency.LEFT,
-            "Politisch Links": PoliticalTendency.LEFT,
-            "Center-Left": PoliticalTendency.CENTER_LEFT,
-            "Politisch Mitte-Links": PoliticalTendency.CENTER_LEFT,
-            "Center": PoliticalTendency.CENTER,
-            "Politisch Mitte": PoliticalTendency.CENTER,
-            "Center-Right": PoliticalTendency.CENTER_RIGHT,
-            "Politisch Mitte-Rechts": PoliticalTendency.CENTER_RIGHT,
-            "Right": PoliticalTendency.RIGHT,
-            "Politisch Rechts": PoliticalTendency.RIGHT,
-            "Neutral": PoliticalTendency.NEUTRAL,
-            "Politisch Neutral": PoliticalTendency.NEUTRAL
-        }
-        return mapping.get(label, PoliticalTendency.NEUTRAL)
-
-    def _map_to_intent(self, label: str, language: str) -> Intent:
-        mapping = {
-            "Informative": Intent.INFORMATIVE,
-            "Informativ": Intent.INFORMATIVE,
-            "Persuasive": Intent.PERSUASIVE,
-            "Überzeugend": Intent.PERSUASIVE,
-            "Satirical": Intent.SATIRICAL,
-            "Satirisch": Intent.SATIRICAL,
-            "Provocative": Intent.PROVOCATIVE,
-            "Provozierend": Intent.PROVOCATIVE,
-            "Commercial": Intent.COMMERCIAL,
-            "Kommerziell": Intent.COMMERCIAL,
-            "Entertaining": Intent.ENTERTAINING,
-            "Unterhaltend": Intent.ENTERTAINING
+        post_id: str,
+        timestamp: str,
+        language: str,
+        error: Exception
+    ) -> Dict:
+        logger.error(f"Analysis failed for post {post_id}: {error}")
+        return {
+            **_ERROR_FALLBACK,
+            "post_id": post_id,
+            "analysis_timestamp": timestamp,
+            "language": language,
+            "processing_error": f"Analysis failed: {str(error)}"
         }
-        return mapping.get(label, Intent.INFORMATIVE)
+
+    def _map_veracity_status(self, status: str) -> VeracityStatus:
+        return _VERACITY_MAP.get(status, VeracityStatus.UNVERIFIABLE)
+
+    def _map_to_post_type(self, label: str) -> PostType:
+        return _POST_TYPE_MAP.get(label, PostType.OPINION)
+
+    def _map_to_political_tendency(self, label: str) -> PoliticalTendency:
+        return _POLITICAL_MAP.get(label, PoliticalTendency.NEUTRAL)
+
+    def _map_to_intent(self, label: str) -> Intent:
+        return _INTENT_MAP.get(label, Intent.INFORMATIVE)
@@ -0,0 +1,83 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import orjson
+from anthropic import APIStatusError
+from src.services.claude_service import ClaudeService
+from src.services.evaluation_service import AdvancedEvaluationService
+
+
+class StubMessages:
+    """Stands in for ``client.messages``; ``respond`` maps a prompt to the reply after the prefill."""
+
+    def __init__(self, respond=None, stream_chunks=()):
+        self.respond = respond
+        self.stream_chunks = stream_chunks
+        self.calls = []
+        self.streamed = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        await self.release.wait()
+        return SimpleNamespace(content=[SimpleNamespace(text=self.respond(kwargs["messages"][0]["content"]))])
+
+    def stream(self, **kwargs):
+        self.calls.append(kwargs)
+        return StubStream(self)
+
+
+class StubStream:
+
+    def __init__(self, messages):
+        self.messages = messages
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def __aiter__(self):
+        for chunk in self.messages.stream_chunks:
+            self.messages.streamed.append(chunk)
+            yield SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(text=chunk))
+
+
+def make_service(messages):
+    service = ClaudeService()
+    service.client = SimpleNamespace(messages=messages)
+    service.enabled = True
+    return service
+
+
+def make_evaluation_service(messages):
+    service = AdvancedEvaluationService()
+    service.claude_service.client = SimpleNamespace(messages=messages)
+    service.claude_service.enabled = True
+    return service
+
+
+def reply(data):
+    # The service prefills the opening brace, so the model's reply starts after it
+    return orjson.dumps(data).decode()[1:]
+
+
+def combined_item(primary_label="Opinion", **extra):
+    return {
+        **extra,
+        "post_type": {"primary_label": primary_label, "confidence": 0.9, "scores": {primary_label: 0.9}},
+        "political": {"scores": {"Center": 0.8}},
+        "intents": {"scores": {"Informative": 0.7}}
+    }
+
+
+def api_error(status_code):
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    return APIStatusError(
+        f"Error code: {status_code}",
+        response=httpx.Response(status_code, request=request),
+        body=None
+    )
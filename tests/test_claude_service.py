@@ -0,0 +1,235 @@
+import asyncio
+import re
+
+import orjson
+from src.services.claude_service import BATCH_CHUNK_SIZE, MODEL_MAX_OUTPUT_TOKENS
+from tests.stubs import StubMessages, api_error, combined_item, make_service, reply
+
+EN_POST_TYPES = ("Factual Claim", "Opinion", "Question", "Personal Update", "Promotion")
+EN_POLITICAL = ("Left", "Center-Left", "Center", "Center-Right", "Right", "Neutral")
+EN_INTENTS = ("Informative", "Persuasive", "Satirical", "Provocative", "Commercial", "Entertaining")
+
+
+def test_cached_call_counts_hits_and_misses():
+    messages = StubMessages(lambda prompt: reply({"scores": {"Center": 0.8}}))
+    service = make_service(messages)
+
+    async def run():
+        first = await service.analyze_political_tendency("Same text", "en")
+        second = await service.analyze_political_tendency("Same text", "en")
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first["Center"] == 0.8
+    assert second is first
+    assert len(messages.calls) == 1
+    assert service.cache_misses == 1
+    assert service.cache_hits == 1
+
+
+def test_cached_call_does_not_cache_parse_errors():
+    messages = StubMessages(lambda prompt: "not json")
+    service = make_service(messages)
+
+    async def run():
+        await service.analyze_political_tendency("Broken reply", "en")
+        return await service.analyze_political_tendency("Broken reply", "en")
+
+    scores = asyncio.run(run())
+
+    assert scores == {label: 1.0 / len(EN_POLITICAL) for label in EN_POLITICAL}
+    assert len(messages.calls) == 2
+    assert service.cache_hits == 0
+
+
+def test_cached_call_coalesces_concurrent_duplicates():
+    messages = StubMessages(lambda prompt: reply({"scores": {"Persuasive": 0.6}}))
+    messages.release.clear()
+    service = make_service(messages)
+
+    async def run():
+        tasks = [
+            asyncio.ensure_future(service.analyze_intents("Buy now", "en"))
+            for _ in range(5)
+        ]
+        await asyncio.sleep(0)
+        messages.release.set()
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(run())
+
+    assert len(messages.calls) == 1
+    assert service.cache_misses == 1
+    assert service.coalesced_calls == 4
+    assert all(result["Persuasive"] == 0.6 for result in results)
+
+
+def test_cached_call_owner_cancellation_does_not_cancel_waiters():
+    messages = StubMessages(lambda prompt: reply({"scores": {"Persuasive": 0.6}}))
+    messages.release.clear()
+    service = make_service(messages)
+
+    async def run():
+        owner = asyncio.ensure_future(service.analyze_intents("Buy now", "en"))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(service.analyze_intents("Buy now", "en"))
+        await asyncio.sleep(0)
+        owner.cancel()
+        messages.release.set()
+        return await waiter
+
+    result = asyncio.run(run())
+
+    assert result["Persuasive"] == 0.6
+    assert len(messages.calls) == 1
+
+
+def test_classify_post_type_stops_streaming_once_label_and_confidence_are_decoded():
+    messages = StubMessages(stream_chunks=(
+        '"primary_label": "Question", ',
+        '"confidence": 0.85,',
+        ' "scores": {"Question": 0.85}}'
+    ))
+    service = make_service(messages)
+
+    primary_label, confidence, scores = asyncio.run(service.classify_post_type("What time is it?", "en"))
+
+    assert primary_label == "Question"
+    assert confidence == 0.85
+    assert scores == {**dict.fromkeys(EN_POST_TYPES, 0.0), "Question": 1.0}
+    assert len(messages.streamed) == 2
+
+
+def test_classify_post_type_unknown_streamed_label_keeps_fixed_label_set():
+    messages = StubMessages(stream_chunks=('"primary_label": "Rant", "confidence": 0.7}',))
+    service = make_service(messages)
+
+    primary_label, _, scores = asyncio.run(service.classify_post_type("Ugh, Mondays.", "en"))
+
+    assert primary_label == "Rant"
+    assert tuple(scores) == EN_POST_TYPES
+
+
+def test_analyze_combined_parses_all_three_analyses():
+    messages = StubMessages(lambda prompt: reply(combined_item("Factual Claim")))
+    service = make_service(messages)
+
+    classification, political_scores, intent_scores = asyncio.run(
+        service.analyze_combined("The earth orbits the sun.", "en")
+    )
+
+    assert classification[:2] == ("Factual Claim", 0.9)
+    assert tuple(classification[2]) == EN_POST_TYPES
+    assert political_scores["Center"] == 0.8
+    assert tuple(political_scores) == EN_POLITICAL
+    assert intent_scores["Informative"] == 0.7
+    assert tuple(intent_scores) == EN_INTENTS
+    assert len(messages.calls) == 1
+
+
+def test_analyze_combined_falls_back_to_separate_calls_on_unparseable_reply():
+    def respond(prompt):
+        if "three steps" in prompt:
+            return '"post_type": "Opinion"}'
+        return reply({"scores": {"Neutral": 1.0}})
+
+    messages = StubMessages(respond)
+    service = make_service(messages)
+
+    _, political_scores, intent_scores = asyncio.run(service.analyze_combined("Hello there", "en"))
+
+    assert political_scores["Neutral"] == 1.0
+    assert len(messages.calls) == 4
+
+
+def test_analyze_combined_returns_defaults_when_api_call_fails():
+    def respond(prompt):
+        raise api_error(400)
+
+    messages = StubMessages(respond)
+    service = make_service(messages)
+
+    result = asyncio.run(service.analyze_combined("Hello there", "en"))
+
+    assert result == service._get_default_combined_analysis("en")
+    assert len(messages.calls) == 1
+
+
+def test_parse_combined_batch_response_skips_missing_duplicate_and_out_of_range_ids():
+    service = make_service(StubMessages())
+    response = orjson.dumps({"results": [
+        combined_item("Opinion", id=1),
+        combined_item("Question", id=1),
+        combined_item("Opinion", id=0),
+        combined_item("Opinion", id=4),
+        combined_item("Promotion", id=3),
+        {"id": "two"}
+    ]}).decode()
+
+    results = service._parse_combined_batch_response(
+        response, 3, EN_POST_TYPES, EN_POLITICAL, EN_INTENTS
+    )
+
+    assert sorted(results) == [1, 3]
+    assert results[1][0][0] == "Opinion"
+    assert results[3][0][0] == "Promotion"
+
+
+def test_analyze_combined_batch_falls_back_for_missing_ids():
+    def respond(prompt):
+        if "numbered texts" in prompt:
+            return reply({"results": [combined_item("Opinion", id=1), combined_item("Opinion", id=5)]})
+        return reply(combined_item("Question"))
+
+    messages = StubMessages(respond)
+    service = make_service(messages)
+
+    results = asyncio.run(service.analyze_combined_batch(["First post", "Second post?"], "en"))
+
+    assert [result[0][0] for result in results] == ["Opinion", "Question"]
+    assert len(messages.calls) == 2
+    assert '"Second post?"' in messages.calls[1]["messages"][0]["content"]
+
+
+def test_analyze_combined_batch_falls_back_per_post_on_unparseable_reply():
+    def respond(prompt):
+        if "numbered texts" in prompt:
+            return '"results": "none"}'
+        return reply(combined_item("Question"))
+
+    messages = StubMessages(respond)
+    service = make_service(messages)
+
+    results = asyncio.run(service.analyze_combined_batch(["First post?", "Second post?"], "en"))
+
+    assert [result[0][0] for result in results] == ["Question", "Question"]
+    assert len(messages.calls) == 3
+
+
+def test_analyze_combined_batch_returns_defaults_when_api_call_fails():
+    def respond(prompt):
+        raise api_error(400)
+
+    messages = StubMessages(respond)
+    service = make_service(messages)
+
+    results = asyncio.run(service.analyze_combined_batch(["First post", "Second post"], "en"))
+
+    assert results == [service._get_default_combined_analysis("en")] * 2
+    assert len(messages.calls) == 1
+
+
+def test_analyze_combined_batch_splits_into_chunks_within_output_cap():
+    def respond(prompt):
+        count = len(re.findall(r'^\d+\. "', prompt, re.MULTILINE))
+        return reply({"results": [combined_item("Opinion", id=index) for index in range(1, count + 1)]})
+
+    messages = StubMessages(respond)
+    service = make_service(messages)
+    texts = [f"Post number {index}" for index in range(BATCH_CHUNK_SIZE + 1)]
+
+    results = asyncio.run(service.analyze_combined_batch(texts, "en"))
+
+    assert len(results) == len(texts)
+    assert sorted(call["max_tokens"] for call in messages.calls) == [512, MODEL_MAX_OUTPUT_TOKENS]
@@ -1,7 +1,9 @@
 import pytest
 from fastapi.testclient import TestClient
-from src.main import app, app_state
+from src.main import app, app_state, deep_health_cache
+from src.models.api_models import AdvancedEvaluationResponse
 from src.services.evaluation_service import AdvancedEvaluationService
+from tests.stubs import StubMessages, combined_item, make_evaluation_service, reply
 
 app_state["evaluation_service"] = AdvancedEvaluationService()
 
@@ -18,6 +20,34 @@ def test_health_endpoint_returns_operational_status():
     assert data["version"] == "2.0.0"
 
 
+def test_deep_health_endpoint_returns_operational_status(monkeypatch):
+    messages = StubMessages(lambda prompt: "}")
+    monkeypatch.setitem(app_state, "evaluation_service", make_evaluation_service(messages))
+    deep_health_cache.clear()
+    response = client.get("/healthz/deep")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "operational"
+    assert "timestamp" in data
+    assert data["version"] == "2.0.0"
+    assert len(messages.calls) == 1
+
+
+def test_deep_health_endpoint_reports_degraded_when_claude_fails(monkeypatch):
+    def respond(prompt):
+        raise RuntimeError("connection refused")
+
+    monkeypatch.setitem(app_state, "evaluation_service", make_evaluation_service(StubMessages(respond)))
+    deep_health_cache.clear()
+    response = client.get("/healthz/deep")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "degraded"
+    assert data["version"] == "2.0.0"
+
+
 def test_config_endpoint_returns_service_configuration():
     response = client.get("/config")
     
@@ -27,6 +57,7 @@ def test_config_endpoint_returns_service_configuration():
     assert "enable_veracity_check" in data
     assert "enable_nuance_analysis" in data
     assert "claude_model" in data
+    assert set(data["claude_cache"]) == {"size", "hits", "misses", "coalesced"}
 
 
 def test_evaluate_english_content_returns_analysis():
@@ -97,6 +128,101 @@ def test_evaluate_question_content_returns_analysis():
     assert "nuance_analysis" in data
 
 
+def test_evaluate_result_matches_response_model(monkeypatch):
+    messages = StubMessages(lambda prompt: reply(combined_item("Opinion")))
+    monkeypatch.setitem(app_state, "evaluation_service", make_evaluation_service(messages))
+    response = client.post(
+        "/evaluate",
+        json={
+            "post_id": "model_001",
+            "post_text": "I think pineapple belongs on pizza.",
+            "language": "en"
+        }
+    )
+    
+    assert response.status_code == 200
+    result = AdvancedEvaluationResponse.model_validate(response.json())
+    assert result.post_analysis.is_spam is False
+    assert result.nuance_analysis is not None
+    assert result.processing_error is None
+
+
+def test_evaluate_spam_result_matches_response_model(monkeypatch):
+    messages = StubMessages(lambda prompt: reply(combined_item("Promotion")))
+    monkeypatch.setitem(app_state, "evaluation_service", make_evaluation_service(messages))
+    response = client.post(
+        "/evaluate",
+        json={
+            "post_id": "model_002",
+            "post_text": "Buy cheap followers now at our shop!",
+            "language": "en"
+        }
+    )
+    
+    assert response.status_code == 200
+    result = AdvancedEvaluationResponse.model_validate(response.json())
+    assert result.post_analysis.is_spam is True
+    assert result.nuance_analysis is None
+
+
+def test_evaluate_error_fallback_matches_response_model(monkeypatch):
+    async def fail(post_text, language):
+        raise RuntimeError("analysis failed")
+
+    service = AdvancedEvaluationService()
+    monkeypatch.setattr(service, "_run_combined_analysis", fail)
+    monkeypatch.setitem(app_state, "evaluation_service", service)
+    response = client.post(
+        "/evaluate",
+        json={
+            "post_id": "model_003",
+            "post_text": "The weather is nice today.",
+            "language": "en"
+        }
+    )
+    
+    assert response.status_code == 200
+    result = AdvancedEvaluationResponse.model_validate(response.json())
+    assert result.post_id == "model_003"
+    assert result.processing_error == "Analysis failed: analysis failed"
+
+
+def test_evaluate_batch_returns_analysis_per_post(monkeypatch):
+    messages = StubMessages(lambda prompt: reply({"results": [combined_item("Opinion", id=1)]}))
+    monkeypatch.setitem(app_state, "evaluation_service", make_evaluation_service(messages))
+
+    response = client.post(
+        "/evaluate_batch",
+        json=[
+            {
+                "post_id": "batch_001",
+                "post_text": "The weather is nice today.",
+                "language": "en"
+            },
+            {
+                "post_id": "batch_002",
+                "post_text": "Das Wetter ist heute schön.",
+                "language": "de"
+            }
+        ]
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["post_id"] for item in data] == ["batch_001", "batch_002"]
+    assert [item["language"] for item in data] == ["en", "de"]
+    assert [item["post_analysis"]["post_type"] for item in data] == ["Opinion", "Opinion"]
+    assert all(item["processing_error"] is None for item in data)
+    assert all("nuance_analysis" in item for item in data)
+    assert len(messages.calls) == 2
+
+
+def test_evaluate_batch_empty_list_returns_error():
+    response = client.post("/evaluate_batch", json=[])
+    
+    assert response.status_code == 422
+
+
 def test_evaluate_invalid_input_returns_validation_error():
     response = client.post(
         "/evaluate",